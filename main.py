@@ -1,5 +1,6 @@
 import typer
 import logging
+from typing import List
 from services import *
 from config_manager import load_config, update_config
 from pathlib import Path
@@ -19,27 +20,62 @@ CONFIG_DESC = {
 }
 
 @app.command()
-def ip(domain: str):
-    """根据 IP   查询 IP 地址信息   试试 python main.py ip 114.114.114.114"""
+def ip(
+    domain: str,
+    workers: int = typer.Option(20, "--workers", min=1, help="CIDR / IP 范围查询的最大并发数"),
+    max_hosts: int = typer.Option(MAX_HOSTS, "--max-hosts", min=1, help="CIDR / IP 范围允许展开的最大地址数")
+):
+    """根据 IP   查询 IP 地址信息   试试 python main.py ip 114.114.114.0/24"""
     logger.info(f"开始 IP 查询: {domain}")
-    ip_log_path = log_root / "ip" /f"{domain}.ip.log"
-    query_ip(domain, str(ip_log_path), proxy)
+    ip_log_path = log_root / "ip" / f"{domain.replace('/', '_')}.ip.log"
+    try:
+        size = ip_block_size(domain)
+    except ValueError as e:
+        logger.error(f"IP 目标格式错误: {e}")
+        return
+    if size is not None:
+        query_ip_batch(domain, str(ip_log_path), proxy, max_workers=workers, max_hosts=max_hosts)
+    else:
+        query_ip(domain, str(ip_log_path), proxy)
 
 
 @app.command()
-def icp(domain: str):
-    """根据 域名 查询 ICP 备案信息  试试 python main.py icp baidu.com"""
-    logger.info(f"开始 ICP 查询: {domain}")
-    icp_log_path = log_root / "icp" / f"{domain}.icp.log"
-    query_icp(domain, str(icp_log_path), proxy)
+def icp(
+    domains: List[str],
+    workers: int = typer.Option(10, "--workers", min=1, help="ICP 分页并发请求数")
+):
+    """根据 域名 查询 ICP 备案信息  试试 python main.py icp baidu.com www.baidu.com"""
+    for domain, targets in group_targets(domains, logger).items():
+        keyword = to_unicode(domain)
+        logger.info(f"开始 ICP 查询: {keyword} (目标: {', '.join(targets)})")
+        # 同一注册域名的目标共享一份日志，文件以注册域名命名
+        icp_log_path = log_root / "icp" / f"{domain.replace('/', '_')}.icp.log"
+        try:
+            results = query_icp(keyword, str(icp_log_path), proxy, max_workers=workers)
+        except Exception as e:
+            logger.error(f"ICP 查询失败: {keyword}, {e}")
+            continue
+        icp_numbers = ", ".join(item["icp_number"] for item in results) or "-"
+        for target in targets:
+            logger.info(f"{target} -> {keyword}: 共 {len(results)} 条 ICP 备案记录 ({icp_numbers})，详见 {icp_log_path}")
 
 
 @app.command()
-def whois(domain: str):
-    """根据 域名 查询 WHOIS 信息    试试 python main.py whois qq.com"""
-    logger.info(f"开始 WHOIS 查询: {domain}")
-    whois_log_path = log_root / "whois" / f"{domain}.whois.log"
-    query_whois(domain, str(whois_log_path))
+def whois(domains: List[str]):
+    """根据 域名 查询 WHOIS 信息    试试 python main.py whois qq.com mail.qq.com"""
+    for domain, targets in group_targets(domains, logger).items():
+        name = to_unicode(domain)
+        logger.info(f"开始 WHOIS 查询: {name} (目标: {', '.join(targets)})")
+        # 同一注册域名的目标共享一份日志，文件以注册域名命名
+        whois_log_path = log_root / "whois" / f"{domain.replace('/', '_')}.whois.log"
+        try:
+            result = query_whois(name, str(whois_log_path))
+        except Exception as e:
+            logger.error(f"WHOIS 查询失败: {name}, {e}")
+            result = None
+        for target in targets:
+            status = "查询成功" if result is not None else "查询失败"
+            logger.info(f"{target} -> {name}: WHOIS {status}，详见 {whois_log_path}")
 
 
 @app.command()
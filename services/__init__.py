@@ -1,7 +1,8 @@
 from .cdn import uutool
 from .whois import query_whois
-from .ip import query_ip
+from .ip import query_ip, query_ip_batch, ip_block_size, MAX_HOSTS
 from .icp import query_icp
+from .target import normalize_target, registrable_domain, group_targets, to_unicode
 from .logger import init_logger, _err_log_path, get_logger, init_err_path
 
-__all__ = ["uutool", "query_whois", "query_ip", "query_icp", "init_logger", "_err_log_path", "get_logger", "init_err_path"]
+__all__ = ["uutool", "query_whois", "query_ip", "query_ip_batch", "ip_block_size", "MAX_HOSTS", "query_icp", "normalize_target", "registrable_domain", "group_targets", "to_unicode", "init_logger", "_err_log_path", "get_logger", "init_err_path"]
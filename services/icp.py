@@ -1,34 +1,137 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import re
 import requests
+from urllib.parse import parse_qs, urlencode, urljoin, urlsplit, urlunsplit
 from bs4 import BeautifulSoup
 from .logger import get_logger
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
-def query_icp(keyword: str, log_path: Optional[str] = None, proxy: Optional[str] = None):
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+def parse_icp_rows(html: str) -> List[Dict[str, str]]:
     """
-    完成从域名到 ICP 信息的完整查询流程：
-        1. 获取初始 acw_tc cookie 并生成请求 headers
-        2. 获取 ASP cookies 并组合到 headers
-        3. 刷新缓存以获取最新 ICP 数据
-        4. 请求 ICP 页面并解析 HTML 表格
-        5. 将每条记录打印并通过 logger 输出
+    解析单页 ICP 查询结果中的所有 table.table 表格。
 
     Args:
-        keyword (str): 查询域名或关键词
-        log_path (Optional[str]): 日志存储路径
-        proxy (Optional[str]): HTTP/HTTPS 代理地址，例如 'http://127.0.0.1:7890'
+        html (str): ICP 查询页面 HTML
 
+    Returns:
+        List[Dict[str, str]]: 该页的备案记录列表
     """
-    logger = get_logger(name="icp", log_path=log_path if log_path is not None else None)
-    logger.info(f"开始查询 ICP: {keyword}")
+    items = []
+    soup = BeautifulSoup(html, 'html.parser')
+    for table in soup.find_all('table', class_='table'):
+        for row in table.find_all('tr')[1:]:
+            cells = row.find_all('td')
+            if len(cells) >= 7:
+                items.append({
+                    "company": cells[1].get_text(strip=True),
+                    "domain": cells[5].get_text(strip=True),
+                    "icp_number": cells[3].get_text(strip=True),
+                    "audit_date": cells[6].get_text(strip=True)
+                })
+    return items
+
+
+def _find_page_locator(url: str, page: int) -> Optional[Tuple[str, Optional[str]]]:
+    '''找出页码在链接中的位置：("query", 参数名) 或 ("path", None)'''
+    parts = urlsplit(url)
+    for key, values in parse_qs(parts.query).items():
+        if str(page) in values:
+            return "query", key
+    segments = parts.path.rstrip("/").split("/")
+    if segments and segments[-1] == str(page):
+        return "path", None
+    return None
+
+
+def _page_of(url: str, locator: Tuple[str, Optional[str]]) -> Optional[int]:
+    '''按页码位置从链接中读取页码'''
+    parts = urlsplit(url)
+    if locator[0] == "query":
+        value = parse_qs(parts.query).get(locator[1], [""])[0]
+    else:
+        value = parts.path.rstrip("/").split("/")[-1]
+    return int(value) if value.isdigit() else None
+
+
+def _with_page(url: str, locator: Tuple[str, Optional[str]], page: int) -> str:
+    '''按页码位置将链接改写为指定页码'''
+    parts = urlsplit(url)
+    if locator[0] == "query":
+        query = parse_qs(parts.query, keep_blank_values=True)
+        query[locator[1]] = [str(page)]
+        return urlunsplit(parts._replace(query=urlencode(query, doseq=True)))
+    segments = parts.path.rstrip("/").split("/")
+    segments[-1] = str(page)
+    return urlunsplit(parts._replace(path="/".join(segments)))
+
+
+def parse_page_urls(html: str, base_url: str) -> Dict[int, str]:
+    """
+    从分页导航中提取第 2 页及之后各页的地址，链接均相对 base_url 解析。
+    根据带页码的链接识别页码所在的参数或路径段，总页数同时参考 "尾页"、"»" 等非数字链接，
+    分页导航只显示部分页码时据此补全全部页码。
+
+    Args:
+        html (str): ICP 查询首页 HTML
+        base_url (str): 首页地址
+
+    Returns:
+        Dict[int, str]: 页码 -> 页面地址，不存在分页时为空
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    anchors = [(link.get_text(strip=True), urljoin(base_url, link["href"]))
+               for link in soup.select('.pagination a, .pager a') if link.get("href")]
+    links = {int(text): url for text, url in anchors if text.isdigit()}
+
+    # 通过带页码的链接识别页码位置
+    locator, template = None, None
+    for page, url in sorted(links.items()):
+        if page > 1:
+            locator = _find_page_locator(url, page)
+            if locator:
+                template = url
+                break
+
+    if locator:
+        # 尾页 / 下一页 等链接同样携带页码，一并计入总页数
+        pages = [page for page in (_page_of(url, locator) for _, url in anchors) if page]
+        last = max(pages + list(links))
+        for page in range(2, last + 1):
+            links.setdefault(page, _with_page(template, locator, page))
+
+    return {page: url for page, url in sorted(links.items()) if page > 1 and url != base_url}
+
+
+def iter_icp(keyword: str, logger, proxy: Optional[str] = None, max_workers: int = 5) -> Iterator[Dict[str, str]]:
+    """
+    逐页产出 ICP 备案记录：首页解析完成后并发抓取剩余分页，每页解析完即产出，按 ICP 备案号去重。
 
+    Args:
+        keyword (str): 查询域名或单位名称
+        logger: 日志对象
+        proxy (Optional[str]): HTTP/HTTPS 代理地址
+        max_workers (int): 分页并发线程数
+
+    Yields:
+        Dict[str, str]: 单条备案记录
+    """
     search_url = f"https://www.beianx.cn/search/{keyword}"
     cache_url = f"https://www.beianx.cn/up_cache_2025/ajax_get2?type=&keyword={keyword}"
     proxies = {"http": proxy, "https": proxy} if proxy else None
 
+    # 所有请求复用同一个会话与 cookie
+    session = requests.Session()
+
     # 1. 获取 acw_tc cookie
-    resp = requests.get(search_url, headers={"User-Agent": "Mozilla/5.0"}, proxies=proxies)
+    try:
+        resp = session.get(search_url, headers=HEADERS, proxies=proxies, timeout=15)
+    except Exception as e:
+        logger.error(f"获取初始 Cookie 失败: {e}")
+        return
     cookie_str = resp.headers.get("Set-Cookie", "")
     logger.debug(f"初始响应Cookie: {cookie_str}")
 
@@ -39,9 +142,13 @@ def query_icp(keyword: str, log_path: Optional[str] = None, proxy: Optional[str]
         logger.debug(f"生成 acw_tc cookie: {acw_tc}")
 
     # 2. 获取 ASP Cookie
-    headers = {"User-Agent": "Mozilla/5.0"}
+    headers = dict(HEADERS)
     if acw_tc:
-        resp2 = requests.get(search_url, headers={"Cookie": acw_tc, "User-Agent": "Mozilla/5.0"}, proxies=proxies)
+        try:
+            resp2 = session.get(search_url, headers={"Cookie": acw_tc, **HEADERS}, proxies=proxies, timeout=15)
+        except Exception as e:
+            logger.error(f"获取 ASP Cookie 失败: {e}")
+            return
         set_cookie = resp2.headers.get("Set-Cookie", "")
         asp_cookies = {m.group(1).strip(): m.group(2).strip()
                        for item in set_cookie.split(', ') if ".AspNet" in item
@@ -51,7 +158,7 @@ def query_icp(keyword: str, log_path: Optional[str] = None, proxy: Optional[str]
 
     # 3. 刷新缓存
     try:
-        resp_cache = requests.get(cache_url, headers=headers, proxies=proxies, timeout=20)
+        resp_cache = session.get(cache_url, headers=headers, proxies=proxies, timeout=20)
         if '"msg":"更新成功"' in resp_cache.text:
             logger.info("刷新缓存成功")
         else:
@@ -59,46 +166,94 @@ def query_icp(keyword: str, log_path: Optional[str] = None, proxy: Optional[str]
     except Exception as e:
         logger.error(f"刷新缓存异常: {e}")
 
-    # 4. 请求 ICP 页面
+    def fetch_page(url: str) -> str:
+        resp_page = session.get(url, headers=headers, proxies=proxies, timeout=15)
+        resp_page.raise_for_status()
+        return resp_page.text
+
+    # 4. 请求 ICP 首页
     try:
-        resp_final = requests.get(search_url, headers=headers, proxies=proxies, timeout=15)
-        resp_final.raise_for_status()
+        first_html = fetch_page(search_url)
     except Exception as e:
         logger.error(f"ICP 页面请求失败: {e}")
-        return []
+        return
+
+    # 5. 解析首页并并发抓取剩余分页，逐页产出去重后的记录
+    seen = set()
+
+    def unseen(items: List[Dict[str, str]]) -> Iterator[Dict[str, str]]:
+        for item in items:
+            key = item["icp_number"] or item["domain"]
+            if key not in seen:
+                seen.add(key)
+                yield item
 
-    # 5. 解析数据
-    results = []
     try:
-        soup = BeautifulSoup(resp_final.text, 'html.parser')
-        rows = soup.find('table', class_='table').find_all('tr')[1:]
-        logger.info(f"找到 {len(rows)} 行数据")
-        for row in rows:
-            cells = row.find_all('td')
-            if len(cells) >= 7:
-                item = {
-                    "company": cells[1].get_text(strip=True),
-                    "domain": cells[5].get_text(strip=True),
-                    "icp_number": cells[3].get_text(strip=True),
-                    "audit_date": cells[6].get_text(strip=True)
-                }
-                results.append(item)
-                logger.info(
-                    f"域名 {keyword} 查询结果:\n"
-                    "+------------------+------------------------\n"
-                    f"| 主办单位名称     | {item['company']:<24}\n"
-                    f"| ICP备案号        | {item['icp_number']:<24}\n"
-                    f"| 网站首页地址     | {item['domain']:<24}\n"
-                    f"| 审核通过日期     | {item['audit_date']:<24}\n"
-                    "+------------------+------------------------"
-                )
-
-    # 差错处理
+        page_urls = parse_page_urls(first_html, search_url)
+        first_items = parse_icp_rows(first_html)
+        logger.info(f"共 {len(page_urls) + 1} 页，第 1 页找到 {len(first_items)} 行数据")
+        yield from unseen(first_items)
     except Exception as e:
         logger.error(f"解析 ICP 数据失败: {e}")
+        return
+
+    if not page_urls:
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_page, url): page for page, url in page_urls.items()}
+        for future in as_completed(futures):
+            page = futures[future]
+            try:
+                items = parse_icp_rows(future.result())
+            except Exception as e:
+                logger.error(f"第 {page} 页 ICP 数据获取失败: {e}")
+                continue
+            new_items = list(unseen(items))
+            logger.info(f"第 {page} 页找到 {len(items)} 行数据，新增 {len(new_items)} 条")
+            if not new_items:
+                logger.warning(f"第 {page} 页没有新增记录，分页地址可能无效: {page_urls[page]}")
+            yield from new_items
+
+
+def query_icp(keyword: str, log_path: Optional[str] = None, proxy: Optional[str] = None, max_workers: int = 5):
+    """
+    完成从域名或单位名称到 ICP 信息的完整查询流程：
+        1. 获取初始 acw_tc cookie 并生成请求 headers
+        2. 获取 ASP cookies 并组合到 headers
+        3. 刷新缓存以获取最新 ICP 数据
+        4. 请求 ICP 首页并识别分页，并发请求剩余分页
+        5. 每页解析完成即按 ICP 备案号去重，并通过 logger 输出
+
+    Args:
+        keyword (str): 查询域名或单位名称
+        log_path (Optional[str]): 日志存储路径
+        proxy (Optional[str]): HTTP/HTTPS 代理地址，例如 'http://127.0.0.1:7890'
+        max_workers (int): 分页并发线程数
+
+    Returns:
+        List[Dict[str, str]]: 去重后的全部备案记录
+    """
+    # 每个关键词使用独立 logger，保证各自写入自己的日志文件
+    logger = get_logger(name=f"icp.{keyword}", log_path=log_path if log_path is not None else None)
+    logger.info(f"开始查询 ICP: {keyword}")
+
+    results = []
+    for item in iter_icp(keyword, logger, proxy, max_workers):
+        results.append(item)
+        logger.info(
+            f"域名 {keyword} 查询结果:\n"
+            "+------------------+------------------------\n"
+            f"| 主办单位名称     | {item['company']:<24}\n"
+            f"| ICP备案号        | {item['icp_number']:<24}\n"
+            f"| 网站首页地址     | {item['domain']:<24}\n"
+            f"| 审核通过日期     | {item['audit_date']:<24}\n"
+            "+------------------+------------------------"
+        )
 
     # 打印查询信息
     logger.info(f"查询完成，共 {len(results)} 条记录")
+    return results
 
 
 if __name__ == "__main__":
@@ -1,8 +1,10 @@
 from .logger import get_logger
+import ipaddress
 import requests
 from bs4 import BeautifulSoup
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 
 @dataclass
 class IpRes:
@@ -43,7 +45,8 @@ def format_ipres(ip: str, res: IpRes) -> str:
     # 将表格返回
     return "\n".join(lines)
 
-def query_ip(ip: str, log_path: Optional[str] = None, proxy: Optional[str] = None):
+def query_ip(ip: str, log_path: Optional[str] = None, proxy: Optional[str] = None,
+             session: Optional[requests.Session] = None):
     '''
     IP 查询主接口，通过请求 ip138 网站收集 IP 归属地及绑定信息，并将结果通过日志打印。
 
@@ -51,6 +54,7 @@ def query_ip(ip: str, log_path: Optional[str] = None, proxy: Optional[str] = Non
         ip (str): 目标 IP 地址
         log_path (Optional[str]): 日志存储路径
         proxy (Optional[str]): HTTP/HTTPS 代理
+        session (Optional[requests.Session]): 批量查询时共享的会话，用于复用连接
 
     Returns:
         IpRes: 单 IP 查询结果对象
@@ -69,7 +73,7 @@ def query_ip(ip: str, log_path: Optional[str] = None, proxy: Optional[str] = Non
         proxies = {"http": proxy, "https": proxy} if proxy else None
 
         # 收发请求
-        r = requests.get(f"https://site.ip138.com/{ip}/", proxies=proxies, headers=headers)
+        r = (session or requests).get(f"https://site.ip138.com/{ip}/", proxies=proxies, headers=headers, timeout=10)
         r.raise_for_status()
 
         # 对响应报文信息进行处理，精确找到数据位置
@@ -92,6 +96,156 @@ def query_ip(ip: str, log_path: Optional[str] = None, proxy: Optional[str] = Non
 
     return res
 
+# 单次批量查询允许展开的最大地址数 (/16)
+MAX_HOSTS = 65536
+
+
+def _parse_ip_range(target: str):
+    '''解析 IP 范围为 (起始地址, 结束地址)，格式错误时抛出 ValueError'''
+    start_str, end_str = (part.strip() for part in target.split("-", 1))
+    start = ipaddress.ip_address(start_str)
+    if end_str.isdigit() and start.version == 4:
+        end_str = start_str.rsplit(".", 1)[0] + "." + end_str
+    end = ipaddress.ip_address(end_str)
+    if start.version != end.version or end < start:
+        raise ValueError(f"无效的 IP 范围: {target}")
+    return start, end
+
+
+def ip_block_size(target: str) -> Optional[int]:
+    """
+    判断目标是否为 CIDR 或 IP 范围，并返回其包含的地址数量。
+    以 IP 地址开头的 CIDR / 范围格式错误时 (例如 1.2.3.5-1.2.3.1) 抛出 ValueError，而不是当作主机名处理。
+
+    Args:
+        target (str): 查询目标
+
+    Returns:
+        Optional[int]: 地址数量，目标不是 CIDR / IP 范围 (例如单个 IP 或域名) 时返回 None
+
+    Raises:
+        ValueError: 目标形如 CIDR / IP 范围但无法解析
+    """
+    target = target.strip()
+    sep = "/" if "/" in target else "-" if "-" in target else None
+    if sep is None:
+        return None
+    try:
+        ipaddress.ip_address(target.split(sep, 1)[0].strip())
+    except ValueError:
+        return None
+    if sep == "/":
+        return ipaddress.ip_network(target, strict=False).num_addresses
+    start, end = _parse_ip_range(target)
+    return int(end) - int(start) + 1
+
+
+def expand_ips(target: str) -> Iterator[str]:
+    """
+    将 IP / CIDR / IP 范围惰性展开为单个 IP 地址。
+
+    支持格式: 1.2.3.4、1.2.3.0/24、1.2.3.1-1.2.3.50、1.2.3.1-50、::1-::ff
+
+    Args:
+        target (str): 查询目标
+
+    Yields:
+        str: 单个 IP 地址
+    """
+    target = target.strip()
+    if "/" in target:
+        for host in ipaddress.ip_network(target, strict=False).hosts():
+            yield str(host)
+    elif "-" in target:
+        start, end = _parse_ip_range(target)
+        for value in range(int(start), int(end) + 1):
+            yield str(type(start)(value))
+    else:
+        yield str(ipaddress.ip_address(target))
+
+
+def format_bind_index(index: Dict[str, List[str]]) -> str:
+    """
+    格式化网站到 IP 的聚合索引表格。
+
+    Args:
+        index (Dict[str, List[str]]): 绑定网站 -> IP 列表
+
+    Returns:
+        str: 格式化后的聚合表格
+    """
+    if not index:
+        return "未查到相关绑定信息！"
+    lines = ["\n绑定网站汇总:"]
+    lines.append("+--------------------------------+--------------------------------+")
+    for site in sorted(index):
+        lines.append(f"| {site:<30} | {', '.join(index[site]):<30} |")
+    lines.append("+--------------------------------+--------------------------------+")
+    return "\n".join(lines)
+
+
+def query_ip_batch(target: str, log_path: Optional[str] = None, proxy: Optional[str] = None,
+                   max_workers: int = 20, max_hosts: int = MAX_HOSTS) -> Dict[str, List[str]]:
+    """
+    批量 IP 查询接口，支持 CIDR 与 IP 范围。
+
+    地址惰性展开，在最多 max_workers 个并发请求下逐个查询，每个 IP 查询完成即输出结果，
+    最后将所有 IP 的绑定网站合并为去重后的网站 -> IP 索引。
+
+    Args:
+        target (str): IP / CIDR / IP 范围
+        log_path (Optional[str]): 日志存储路径
+        proxy (Optional[str]): HTTP/HTTPS 代理
+        max_workers (int): 最大并发查询数
+        max_hosts (int): 允许展开的最大地址数，超出时拒绝查询
+
+    Returns:
+        Dict[str, List[str]]: 绑定网站 -> IP 列表
+    """
+    logger = get_logger("ip_query", log_path=log_path)
+    index: Dict[str, List[str]] = {}
+
+    try:
+        size = ip_block_size(target)
+        if size is None:
+            ipaddress.ip_address(target.strip())
+            size = 1
+    except ValueError as e:
+        logger.error(f"IP 目标格式错误: {e}")
+        return index
+    if size > max_hosts:
+        logger.error(f"IP 目标过大: {target} 包含 {size} 个地址，超过上限 {max_hosts}")
+        return index
+
+    def collect(ip: str, res: IpRes):
+        for site in res.bind_sites:
+            ips = index.setdefault(site, [])
+            if ip not in ips:
+                ips.append(ip)
+
+    # 所有查询共享同一会话，连接池大小与并发数一致以复用连接
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    with session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # 控制在途任务数量，避免一次性展开整个网段
+        pending = {}
+        for ip in expand_ips(target):
+            pending[executor.submit(query_ip, ip, log_path, proxy, session)] = ip
+            if len(pending) >= max_workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(pending.pop(future), future.result())
+        for future in list(pending):
+            collect(pending.pop(future), future.result())
+
+    for site_ips in index.values():
+        site_ips.sort(key=ipaddress.ip_address)
+    logger.info(format_bind_index(index))
+    return index
+
 if __name__ == "__main__":
     # 测试 IP 列表
     test_ips = ["8.8.8.8", "114.114.114.114"]
@@ -0,0 +1,175 @@
+"""
+target.py - 查询目标预处理工具
+
+在请求上游之前对目标进行统一处理：
+1. 规范化 URL / 主机名 / 大小写 / IDN
+2. 基于内置 Public Suffix List 快照编译的后缀树，计算注册域名
+3. 按注册域名去重，保留到原始目标的映射用于结果回传
+"""
+import ipaddress
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+PSL_PATH = Path(__file__).parent / "data" / "public_suffix_list.dat"
+
+# 后缀树节点中的规则标记
+_RULE = "$"
+_EXCEPTION = "!"
+
+# PSL 私有域名段 (github.io、s3.amazonaws.com 等) 不对应 ICP / WHOIS 的注册域名，读到此处即停止
+_PRIVATE_MARKER = "===BEGIN PRIVATE DOMAINS==="
+
+# IDNA 中与 '.' 等价的标签分隔符
+_IDNA_DOTS = str.maketrans({"。": ".", "．": ".", "｡": "."})
+
+# 主机名 (可带用户信息、端口、路径)：不含空白和逗号，且至少包含一个 '.' 分隔的标签
+_HOST_RE = re.compile(r"[^\s,，/]+\.[^\s,，/]+(/\S*)?")
+
+
+def _to_ascii(host: str) -> str:
+    '''将主机名逐段转换为 punycode，无法转换的标签保持原样'''
+    labels = []
+    for label in host.split("."):
+        try:
+            labels.append(label.encode("idna").decode("ascii") if label else label)
+        except UnicodeError:
+            labels.append(label)
+    return ".".join(labels)
+
+
+def to_unicode(host: str) -> str:
+    """
+    将 punycode 主机名逐段还原为 Unicode 形式，用于向上游查询。
+
+    Args:
+        host (str): 规范化后的主机名，例如 'xn--fsqu00a.xn--fiqs8s'
+
+    Returns:
+        str: Unicode 主机名，例如 '例子.中国'
+    """
+    labels = []
+    for label in host.split("."):
+        try:
+            labels.append(label.encode("ascii").decode("idna") if label.startswith("xn--") else label)
+        except UnicodeError:
+            labels.append(label)
+    return ".".join(labels)
+
+
+@lru_cache(maxsize=None)
+def load_suffix_trie(path: Optional[str] = None) -> dict:
+    """
+    读取 Public Suffix List 快照中的 ICANN 段并编译为按标签倒序组织的后缀树，结果会被缓存。
+
+    Args:
+        path (Optional[str]): 快照文件路径，默认使用内置快照
+
+    Returns:
+        dict: 后缀树根节点
+    """
+    root: dict = {}
+    with open(path or PSL_PATH, "r", encoding="utf-8") as f:
+        for line in f:
+            rule = line.strip()
+            if _PRIVATE_MARKER in rule:
+                break
+            if not rule or rule.startswith("//"):
+                continue
+            rule = rule.split()[0]
+            exception = rule.startswith("!")
+            node = root
+            for label in reversed(_to_ascii(rule.lstrip("!").lower()).split(".")):
+                node = node.setdefault(label, {})
+            node[_EXCEPTION if exception else _RULE] = True
+    return root
+
+
+def normalize_target(target: str) -> str:
+    """
+    将 URL / 主机名规范化为小写 ASCII 主机名，去除协议、端口、路径、用户信息和末尾的点，
+    并将 IDNA 分隔符 '。．｡' 统一为 '.'。既不是 URL 也不像主机名的关键词 (例如单位名称) 原样返回。
+
+    Args:
+        target (str): 原始目标，例如 'https://WWW.Example.com:8080/x'
+
+    Returns:
+        str: 规范化后的主机名，例如 'www.example.com'
+    """
+    target = target.strip()
+    candidate = target.translate(_IDNA_DOTS)
+    if "://" not in candidate and not _HOST_RE.fullmatch(candidate):
+        return target
+    parts = urlsplit(candidate if "://" in candidate else f"//{candidate}")
+    host = (parts.hostname or candidate).strip().rstrip(".").lower()
+    return _to_ascii(host)
+
+
+def registrable_domain(host: str) -> str:
+    """
+    根据后缀树计算主机名的注册域名 (公共后缀 + 一级标签)。
+    IP 地址、非域名关键词及本身即为公共后缀的主机名原样返回。
+
+    Args:
+        host (str): 规范化后的主机名
+
+    Returns:
+        str: 注册域名，例如 'a.b.example.com.cn' -> 'example.com.cn'
+    """
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+    if not _HOST_RE.fullmatch(host):
+        return host
+
+    labels = host.split(".")
+    # 未命中任何规则时默认规则为 "*"，即公共后缀为最后一级标签
+    suffix_len = 1
+    node = load_suffix_trie()
+    for depth, label in enumerate(reversed(labels), start=1):
+        if "*" in node:
+            suffix_len = depth
+        child = node.get(label)
+        if child is None:
+            break
+        if child.get(_EXCEPTION):
+            suffix_len = depth - 1
+            break
+        if child.get(_RULE):
+            suffix_len = depth
+        node = child
+
+    if suffix_len >= len(labels):
+        return host
+    return ".".join(labels[-(suffix_len + 1):])
+
+
+def group_targets(targets: Iterable[str], logger=None) -> Dict[str, List[str]]:
+    """
+    规范化目标并按注册域名去重，返回注册域名到原始目标的映射，顺序与首次出现顺序一致。
+    注册域名以 punycode 形式作为键，向上游查询时可用 to_unicode 还原。
+    无法规范化的目标 (例如 'http://[::1/') 原样作为键并记录警告，不影响其余目标。
+
+    Args:
+        targets (Iterable[str]): 原始目标列表
+        logger: 日志对象，默认 None
+
+    Returns:
+        Dict[str, List[str]]: 注册域名 -> 原始目标列表
+    """
+    groups: Dict[str, List[str]] = {}
+    for target in targets:
+        try:
+            key = registrable_domain(normalize_target(target))
+        except ValueError as e:
+            if logger:
+                logger.warning(f"目标规范化失败，按原样查询: {target}, {e}")
+            key = target.strip()
+        originals = groups.setdefault(key, [])
+        if target not in originals:
+            originals.append(target)
+    return groups
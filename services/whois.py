@@ -2,11 +2,11 @@ import whois
 from .logger import get_logger
 from typing import Optional
 
-def query_whois(domain: str, log_path: Optional[str] = None) -> None:
-    """查询域名Whois信息并通过日志输出"""
+def query_whois(domain: str, log_path: Optional[str] = None):
+    """查询域名Whois信息并通过日志输出，返回查询结果，失败时返回 None"""
 
-    # 初始化Whois模块专属日志器
-    logger = get_logger("whois_query", log_path=log_path)
+    # 初始化Whois模块专属日志器，每个域名独立以写入各自的日志文件
+    logger = get_logger(f"whois_query.{domain}", log_path=log_path)
 
     try:
         # 调用whois库查询并格式化结果
@@ -14,10 +14,12 @@ def query_whois(domain: str, log_path: Optional[str] = None) -> None:
 
         result_str = "\n".join([f"{k}: {v}" for k, v in result.items() if v is not None])
         logger.info(f"Whois查询结果:\n{result_str}")
+        return result
 
     # 差错处理
     except Exception as e:
         logger.error(f"Whois查询错误: {str(e)}")
+        return None
 
 
 # 测试用例